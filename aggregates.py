@@ -0,0 +1,244 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from startup import timed_import
+
+DATA_DIR = "./data"
+
+def min_max_normalize(series):
+    return (series - series.min()) / (series.max() - series.min())
+
+def data_version(data_dir=DATA_DIR):
+    # Fingerprint of the input files; changes whenever a file in the data directory is replaced
+    digest = hashlib.sha1()
+    for file_name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, file_name)
+        # Subdirectories such as stored snapshots are not inputs of the current data drop
+        if not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+def load_code_metrics_data(data_dir=DATA_DIR):
+    # Load the dataset
+    df = pd.read_csv(f"{data_dir}/project_metrics.csv")
+
+    # Apply logarithmic transformation to commit count
+    df['log_commit_count'] = np.log1p(df['commit_count_6_months'])
+
+    # Normalize each metric
+    df['normalized_commits'] = min_max_normalize(df['log_commit_count'])
+    df['normalized_prs'] = min_max_normalize(df['merged_pull_request_count_6_months'])
+    df['normalized_devs'] = min_max_normalize(df['active_developer_count_6_months'])
+
+    # Calculate the new Development Activity Index
+    df['Development Activity Index'] = (
+        df['normalized_commits'] * 0.5 +
+        df['normalized_prs'] * 0.3 +
+        df['normalized_devs'] * 0.2
+    )
+
+    # Scale the index to a 0-100 range for easier interpretation
+    df['Development Activity Index'] = df['Development Activity Index'] * 100
+
+    # Select and rename relevant columns
+    df = df.rename(columns={
+        'project_name': 'Project Key',
+        'display_name': 'Project Name',
+        'repository_count': 'Repository Count',
+        'commit_count_6_months': 'Commit Count',
+        'active_developer_count_6_months': 'Active Developer Count',
+        'contributor_count_6_months': 'Contributor Count',
+        'new_contributor_count_6_months': 'New Contributor Count',
+        'opened_pull_request_count_6_months': '# of Open PRs',
+        'merged_pull_request_count_6_months': '# of Merged PRs',
+        'opened_issue_count_6_months': '# of Issues Opened',
+        'closed_issue_count_6_months': '# of Issues Closed',
+        'last_commit_date': 'Last Commit'
+    })
+
+    columns = [
+        'Project Key','Project Name', 'Development Activity Index', 'Commit Count', 'Active Developer Count', '# of Merged PRs',
+        'Contributor Count', 'New Contributor Count', 'Repository Count',
+        '# of Open PRs',
+        '# of Issues Opened', '# of Issues Closed', 'Last Commit'
+    ]
+
+    # Sort by Development Activity Index in descending order
+    df = df[columns].sort_values(by='Development Activity Index', ascending=False)
+
+    return df[columns]
+
+def load_onchain_detail(data_dir=DATA_DIR):
+    onchain_data_detail = pd.read_csv(f"{data_dir}/transact.csv")
+
+    # Convert block_timestamp to datetime
+    onchain_data_detail['block_timestamp'] = pd.to_datetime(onchain_data_detail['block_timestamp'])
+
+    # Extract year-month from block_timestamp for aggregation
+    onchain_data_detail['month'] = onchain_data_detail['block_timestamp'].dt.to_period('M')
+
+    return onchain_data_detail
+
+def compute_onchain_summary(onchain_data_detail):
+    # Group by 'month' and 'project_name', and calculate the required aggregations
+    onchain_data = onchain_data_detail.groupby(['month', 'project_name']).agg(
+        transaction_count=('transaction_hash', 'nunique'),
+        distinct_to_addresses=('to_address', 'nunique'),
+        distinct_from_addresses=('from_address', 'nunique')
+    ).reset_index()
+
+    # Create two separate dataframes, one for before and one for after July 1st
+    df_before_july = onchain_data[onchain_data['month'] < '2024-07']
+    df_after_july = onchain_data[onchain_data['month'] >= '2024-07']
+
+    # Group by project and calculate total transaction count for both periods
+    before_july_summary = df_before_july.groupby('project_name')['transaction_count'].sum().reset_index()
+    after_july_summary = df_after_july.groupby('project_name')['transaction_count'].sum().reset_index()
+
+    # Merge the two summaries into one dataframe
+    merged_onchain_summary = pd.merge(before_july_summary, after_july_summary, on='project_name', how='outer', suffixes=('_before_july', '_after_july')).fillna(0)
+
+    # Calculate percentage change ((after - before) / before) * 100
+    merged_onchain_summary['pct_change'] = ((merged_onchain_summary['transaction_count_after_july'] - merged_onchain_summary['transaction_count_before_july']) /
+                                    merged_onchain_summary['transaction_count_before_july'].replace(0, 1)) * 100
+
+    # Sort the data by percentage change in descending order (highest to lowest)
+    merged_onchain_summary = merged_onchain_summary.sort_values(by='pct_change', ascending=False)
+
+    # Identify projects with drops (transaction count after July is less than before July)
+    merged_onchain_summary['dropped'] = merged_onchain_summary['transaction_count_after_july'] < merged_onchain_summary['transaction_count_before_july']
+
+    return merged_onchain_summary
+
+def merge_farcaster_detail(onchain_data_detail, data_dir=DATA_DIR):
+    onchain_data_detail_farcaster = pd.read_csv(f"{data_dir}/Transaction Detail with Farcaster.csv")
+
+    onchain_merge = pd.merge(
+        onchain_data_detail,
+        onchain_data_detail_farcaster[['transaction_hash', 'farcaster_username', 'to_address', 'from_address','artifact_name']],
+        on=['transaction_hash', 'to_address', 'from_address','artifact_name'],
+        how='left'
+    )
+
+    return onchain_merge.drop_duplicates()
+
+def compute_passport_distribution(onchain_merge):
+    aggregate_df = onchain_merge.groupby('project_name').agg(
+        total_transactions=('transaction_hash', 'count'),
+        transaction_with_farcaster_name=('farcaster_username', lambda x: x.notna().sum()),
+        missing_passport_score=('passport_score', lambda x: x.isna().sum()),
+        passport_score_between_0_and_5=('passport_score', lambda x: ((x >= 0) & (x <= 5)).sum()),
+        passport_score_between_5_and_15=('passport_score', lambda x: ((x > 5) & (x <= 15)).sum()),
+        passport_score_above_15=('passport_score', lambda x: (x > 15).sum())
+    ).reset_index()
+
+    aggregate_df['pct_missing'] = (aggregate_df['missing_passport_score'] / aggregate_df['total_transactions']) * 100
+    aggregate_df['pct_0_5'] = (aggregate_df['passport_score_between_0_and_5'] / aggregate_df['total_transactions']) * 100
+    aggregate_df['pct_5_15'] = (aggregate_df['passport_score_between_5_and_15'] / aggregate_df['total_transactions']) * 100
+    aggregate_df['pct_15_plus'] = (aggregate_df['passport_score_above_15'] / aggregate_df['total_transactions']) * 100
+
+    return aggregate_df
+
+def build_project_index(df):
+    # Sort once so each project's rows are contiguous, in time order within a project
+    sorted_df = df.dropna(subset=['project_name']).sort_values(['project_name', 'block_timestamp'], kind='stable').reset_index(drop=True)
+
+    # Offset table: rows of a project are sorted_df.iloc[start:stop]
+    project_names, starts = np.unique(sorted_df['project_name'].to_numpy(), return_index=True)
+    stops = np.append(starts[1:], len(sorted_df))
+    offsets = pd.DataFrame({'start': starts, 'stop': stops}, index=project_names)
+
+    return sorted_df, offsets
+
+def slice_project(sorted_df, offsets, project_name):
+    if project_name not in offsets.index:
+        return sorted_df.iloc[0:0]
+    start, stop = offsets.loc[project_name]
+    return sorted_df.iloc[start:stop]
+
+def build_project_table(data_dir=DATA_DIR):
+    metrics_data = load_code_metrics_data(data_dir).rename(columns={'Project Key': 'project_name'})
+
+    onchain_data_detail = load_onchain_detail(data_dir)
+    merged_onchain_summary = compute_onchain_summary(onchain_data_detail)
+    passport_distribution = compute_passport_distribution(merge_farcaster_detail(onchain_data_detail, data_dir))
+
+    # A project can be a top grantee in more than one program
+    programs = pd.read_csv(f"{data_dir}/Info by program.csv").dropna(subset=['project_name'])
+    project_programs = programs.groupby('project_name')['Program'].agg(lambda x: ', '.join(sorted(x.unique()))).reset_index()
+
+    projects = pd.merge(metrics_data, merged_onchain_summary.drop(columns='dropped'), on='project_name', how='outer')
+    projects = pd.merge(projects, passport_distribution, on='project_name', how='outer')
+    projects = pd.merge(projects, project_programs, on='project_name', how='left')
+
+    return projects.sort_values('project_name').reset_index(drop=True)
+
+def build_user_index(onchain_data_detail):
+    users = onchain_data_detail.dropna(subset=['from_address', 'project_name'])
+
+    # Month index relative to the first month in the data, so gaps in a project's activity are kept
+    timestamps = users['block_timestamp']
+    first = timestamps.min()
+    month_idx = ((timestamps.dt.year - first.year) * 12 + (timestamps.dt.month - first.month)).to_numpy()
+    month_count = int(month_idx.max()) + 1
+    month_labels = pd.period_range(first.strftime('%Y-%m'), periods=month_count, freq='M').astype(str).tolist()
+
+    # Dictionary-encode addresses once, so user ids are comparable across projects
+    user_ids, addresses = pd.factorize(users['from_address'])
+
+    project_users = {}
+    bitmaps = {}
+    for project_name, rows in pd.Series(np.arange(len(users))).groupby(users['project_name'].to_numpy()):
+        project_ids = user_ids[rows.to_numpy()]
+        # Sorted global ids of the project's users; bit i of the project's bitmaps refers to project_users[project_name][i]
+        project_users[project_name] = np.unique(project_ids)
+        local_ids = np.searchsorted(project_users[project_name], project_ids)
+
+        active = np.zeros((month_count, len(project_users[project_name])), dtype=bool)
+        active[month_idx[rows.to_numpy()], local_ids] = True
+        # One packed row of bits per month: bit i is set if user i transacted with the project that month
+        bitmaps[project_name] = np.packbits(active, axis=1)
+
+    return month_labels, len(addresses), project_users, bitmaps
+
+def compute_user_overlap(project_users, address_count):
+    # scipy is only needed for the overlap analysis, so keep it off the startup path
+    sparse = timed_import('scipy.sparse')
+
+    project_names = sorted(project_users)
+
+    # Project x address incidence matrix built from the shared global address ids; each (project, user) pair appears once
+    rows = np.repeat(np.arange(len(project_names)), [len(project_users[name]) for name in project_names])
+    columns = np.concatenate([project_users[name] for name in project_names])
+    incidence = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.int32), (rows, columns)),
+        shape=(len(project_names), address_count)
+    )
+
+    # Entry (i, j) is the number of distinct users shared by projects i and j; the diagonal is each project's user count
+    overlap = (incidence @ incidence.T).toarray()
+
+    return pd.DataFrame(overlap, index=project_names, columns=project_names)
+
+def cluster_overlap(overlap):
+    # linkage needs at least two observations; fewer projects have nothing to reorder
+    if len(overlap) < 2:
+        return overlap
+
+    hierarchy = timed_import('scipy.cluster.hierarchy')
+    distance_utils = timed_import('scipy.spatial.distance')
+
+    # Jaccard distance between the user bases of every pair of projects
+    users = np.diag(overlap.to_numpy())
+    union = users[:, None] + users[None, :] - overlap.to_numpy()
+    distance = 1 - overlap.to_numpy() / np.maximum(union, 1)
+    np.fill_diagonal(distance, 0)
+
+    # Reorder rows and columns so projects with similar user bases sit next to each other
+    order = hierarchy.leaves_list(hierarchy.linkage(distance_utils.squareform(distance, checks=False), method='average'))
+    return overlap.iloc[order, order]
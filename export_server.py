@@ -0,0 +1,149 @@
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import pandas as pd
+
+from aggregates import DATA_DIR, build_project_table, data_version
+
+def build_program_table(projects, data_dir=DATA_DIR):
+    programs = pd.read_csv(f"{data_dir}/Info by program.csv").dropna(subset=['project_name'])
+    program_projects = pd.merge(programs[['Program', 'project_name']], projects.drop(columns='Program'), on='project_name', how='left')
+
+    program_summary = program_projects.groupby('Program').agg(
+        project_count=('project_name', 'nunique'),
+        mean_development_activity_index=('Development Activity Index', 'mean'),
+        commit_count=('Commit Count', 'sum'),
+        merged_pr_count=('# of Merged PRs', 'sum'),
+        transaction_count_before_july=('transaction_count_before_july', 'sum'),
+        transaction_count_after_july=('transaction_count_after_july', 'sum'),
+        total_transactions=('total_transactions', 'sum'),
+        missing_passport_score=('missing_passport_score', 'sum'),
+        passport_score_between_0_and_5=('passport_score_between_0_and_5', 'sum'),
+        passport_score_between_5_and_15=('passport_score_between_5_and_15', 'sum'),
+        passport_score_above_15=('passport_score_above_15', 'sum')
+    ).reset_index()
+
+    # Recompute the passport mix from the summed counts rather than averaging project percentages
+    total_transactions = program_summary['total_transactions'].replace(0, pd.NA)
+    program_summary['pct_missing'] = program_summary['missing_passport_score'] / total_transactions * 100
+    program_summary['pct_0_5'] = program_summary['passport_score_between_0_and_5'] / total_transactions * 100
+    program_summary['pct_5_15'] = program_summary['passport_score_between_5_and_15'] / total_transactions * 100
+    program_summary['pct_15_plus'] = program_summary['passport_score_above_15'] / total_transactions * 100
+
+    return program_summary
+
+class ExportCache:
+    """Aggregates computed once per data version and shared across requests."""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.version = None
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    def get(self):
+        version = data_version(self.data_dir)
+        with self.lock:
+            if version != self.version:
+                projects = build_project_table(self.data_dir)
+                self.tables = {
+                    'projects': projects.set_index('project_name', drop=False),
+                    'programs': build_program_table(projects, self.data_dir).set_index('Program', drop=False),
+                }
+                self.version = version
+            return self.version, self.tables
+
+def serialize(df, fmt):
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode(), 'text/csv; charset=utf-8'
+    return df.to_json(orient='records', date_format='iso').encode(), 'application/json'
+
+class ExportHandler(BaseHTTPRequestHandler):
+    cache = None
+
+    def do_GET(self):
+        path = urlparse(self.path).path.strip('/')
+        fmt = 'json'
+        if path.endswith('.csv') or path.endswith('.json'):
+            path, fmt = path.rsplit('.', 1)
+        parts = [unquote(part) for part in path.split('/') if part]
+
+        version, tables = self.cache.get()
+
+        if parts == ['version']:
+            return self.send_body(json.dumps({'version': version}).encode(), 'application/json', version)
+        if not parts or parts[0] not in tables or len(parts) > 2:
+            return self.send_error(404, "Use /projects, /projects/<project_name>, /programs or /programs/<program>")
+
+        df = tables[parts[0]]
+        if len(parts) == 2 and parts[1] not in df.index:
+            return self.send_error(404, f"Unknown {parts[0][:-1]}: {parts[1]}")
+
+        # The ETag depends only on the data version and the requested resource, so it can be checked before serializing
+        etag = f"{version}-{hashlib.sha1(f'{path}.{fmt}'.encode()).hexdigest()[:8]}"
+        if self.etag_matches(etag):
+            return self.send_not_modified(etag)
+
+        if len(parts) == 2:
+            df = df.loc[[parts[1]]]
+
+        body, content_type = serialize(df, fmt)
+        self.send_body(body, content_type, etag)
+
+    def accepts_gzip(self):
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def etag_matches(self, etag):
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        candidates = {tag.strip().removeprefix('W/').strip('"') for tag in if_none_match.split(',')}
+        return etag in candidates or f"{etag}-gzip" in candidates
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', f'"{etag}-gzip"' if self.accepts_gzip() else f'"{etag}"')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+
+    def send_body(self, body, content_type, etag):
+        gzipped = self.accepts_gzip()
+        if gzipped:
+            body = gzip.compress(body)
+            etag = f"{etag}-gzip"
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', f'"{etag}"')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve precomputed Thank ARB metrics as JSON/CSV.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    ExportHandler.cache = ExportCache(args.data_dir)
+    # Compute the aggregates before accepting requests so the first client does not pay for it
+    ExportHandler.cache.get()
+
+    server = ThreadingHTTPServer((args.host, args.port), ExportHandler)
+    print(f"Serving metrics on http://{args.host}:{args.port}/projects and /programs")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
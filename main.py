@@ -1,66 +1,98 @@
+# Imported before the app's own imports so the 'app script start' milestone is recorded first
+from startup import timed_import, mark, measure_core_imports, startup_report
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta, timezone
-import pytz
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
+from datetime import datetime, timedelta, timezone
+from aggregates import load_code_metrics_data, load_onchain_detail, compute_onchain_summary, merge_farcaster_detail, compute_passport_distribution, build_user_index, compute_user_overlap, cluster_overlap, build_project_index, slice_project
+from snapshots import list_snapshots, load_snapshot_aggregates, diff_snapshots
     
 # Set page configuration to wide layout
 st.set_page_config(layout="wide")
 
-def min_max_normalize(series):
-    return (series - series.min()) / (series.max() - series.min())
-
-def load_code_metrics_data():
-    # Load the dataset
-    df = pd.read_csv("./data/project_metrics.csv")
-    
-    # Apply logarithmic transformation to commit count
-    df['log_commit_count'] = np.log1p(df['commit_count_6_months'])
-
-    # Normalize each metric
-    df['normalized_commits'] = min_max_normalize(df['log_commit_count'])
-    df['normalized_prs'] = min_max_normalize(df['merged_pull_request_count_6_months'])
-    df['normalized_devs'] = min_max_normalize(df['active_developer_count_6_months'])
-
-    # Calculate the new Development Activity Index
-    df['Development Activity Index'] = (
-        df['normalized_commits'] * 0.5 +
-        df['normalized_prs'] * 0.3 +
-        df['normalized_devs'] * 0.2
-    )
-
-    # Scale the index to a 0-100 range for easier interpretation
-    df['Development Activity Index'] = df['Development Activity Index'] * 100
-
-    # Select and rename relevant columns
-    df = df.rename(columns={
-        'project_name': 'Project Key',
-        'display_name': 'Project Name',
-        'repository_count': 'Repository Count',
-        'commit_count_6_months': 'Commit Count',
-        'active_developer_count_6_months': 'Active Developer Count',
-        'contributor_count_6_months': 'Contributor Count',
-        'new_contributor_count_6_months': 'New Contributor Count',
-        'opened_pull_request_count_6_months': '# of Open PRs',	
-        'merged_pull_request_count_6_months': '# of Merged PRs',
-        'opened_issue_count_6_months': '# of Issues Opened',
-        'closed_issue_count_6_months': '# of Issues Closed',
-        'last_commit_date': 'Last Commit'
-    })
-
-    columns = [
-        'Project Key','Project Name', 'Development Activity Index', 'Commit Count', 'Active Developer Count', '# of Merged PRs',
-        'Contributor Count', 'New Contributor Count', 'Repository Count',
-        '# of Open PRs', 
-        '# of Issues Opened', '# of Issues Closed', 'Last Commit'
-    ]
-    
-    # Sort by Development Activity Index in descending order
-    df = df[columns].sort_values(by='Development Activity Index', ascending=False)
-    
-    return df[columns]
+def load_plotting():
+    # plotly.express pulls in a large dependency tree, so it is only imported once a chart is about to be drawn
+    return timed_import('plotly.express'), timed_import('plotly.graph_objects')
+
+# Number of set bits for every possible byte value, used to count users in packed bitmaps
+BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(bitmap):
+    return int(BYTE_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+@st.cache_resource
+def load_onchain_data():
+    # Shared across views and held without copying on each rerun; callers must copy before modifying the frames
+    onchain_data_detail = load_onchain_detail()
+    return onchain_data_detail, compute_onchain_summary(onchain_data_detail)
+
+@st.cache_resource
+def load_farcaster_data():
+    # Only the onchain and drill-down views need the Farcaster merge, so it is kept off the default view
+    onchain_data_detail, _ = load_onchain_data()
+    onchain_merge = merge_farcaster_detail(onchain_data_detail)
+    return onchain_merge, compute_passport_distribution(onchain_merge)
+
+@st.cache_resource
+def load_user_index():
+    # Held without copying on each rerun; the cached id arrays and bitmaps must not be modified
+    onchain_data_detail, _ = load_onchain_data()
+    return build_user_index(onchain_data_detail)
+
+@st.cache_data
+def load_returning_users():
+    _, _, _, user_bitmaps = load_user_index()
+
+    # Returning users are those seen in at least two different months
+    returning_rows = []
+    for project_name, project_bitmaps in user_bitmaps.items():
+        months_active = np.unpackbits(project_bitmaps, axis=1).sum(axis=0)
+        total_users = popcount(np.bitwise_or.reduce(project_bitmaps, axis=0))
+        returning_rows.append({
+            'Project Key': project_name,
+            'Users': total_users,
+            'Returning Users': int((months_active >= 2).sum()),
+        })
+    returning_users = pd.DataFrame(returning_rows)
+    returning_users['% Returning'] = returning_users['Returning Users'] / returning_users['Users'] * 100
+    return returning_users.sort_values('Users', ascending=False)
+
+@st.cache_data
+def load_shared_users():
+    _, address_count, project_users, _ = load_user_index()
+    user_overlap = compute_user_overlap(project_users, address_count)
+
+    # Keep only projects that share at least one user with another project
+    connected_projects = user_overlap.sum(axis=1) > np.diag(user_overlap)
+    return cluster_overlap(user_overlap.loc[connected_projects, connected_projects])
+
+def compute_retention_matrix(month_labels, project_bitmaps):
+    # Users seen in any earlier month, so each cohort only holds first-time users
+    seen = np.zeros(project_bitmaps.shape[1], dtype=np.uint8)
+    rows = []
+    for i, month in enumerate(month_labels):
+        cohort = project_bitmaps[i] & ~seen
+        seen |= project_bitmaps[i]
+        cohort_size = popcount(cohort)
+        if cohort_size == 0:
+            continue
+        row = {'Cohort': month, 'New Users': cohort_size}
+        for offset, active in enumerate(project_bitmaps[i:]):
+            row[f"Month {offset}"] = popcount(cohort & active) / cohort_size * 100
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+@st.cache_resource
+def load_project_index():
+    # Built once per server process and shared across sessions; the cached frames must not be modified
+    onchain_data_detail, _ = load_onchain_data()
+    onchain_merge, _ = load_farcaster_data()
+
+    # Program lookup per project; a project can be a top grantee in more than one program
+    programs = pd.read_csv("./data/Info by program.csv").dropna(subset=['project_name'])
+    project_programs = programs.groupby('project_name')['Program'].unique()
+
+    return build_project_index(onchain_data_detail), build_project_index(onchain_merge), project_programs
 
 # Set up the Streamlit interface
 st.title("Thank ARB Impact Analysis - DRAFT")
@@ -91,9 +123,216 @@ st.markdown(f"\n In the last 6 months, these {project_count} projects: \
             \n - Closed over {total_issues_closed:,} issues (and created {total_issues_opened:,} new ones) \
             \n - Merged over {total_merged_PR:,} pull requests (and opened {total_open_PR:,} new ones)")
 
-overall_summary, integrated_view, onchain_metrics, code_metrics = st.tabs(["Top Grantee Summary", "Integrated View", "Onchain Transactions", "Code Metrics"])
+mark('time to first render (header and summary metrics)')
+
+# Only the selected view runs, so the imports and computation behind the other views are deferred until they are opened
+view = st.radio("View", ["Top Grantee Summary", "Project Drill-down", "Integrated View", "Onchain Transactions", "User Retention", "Code Metrics", "Snapshot Diff"], horizontal=True, label_visibility="collapsed")
+
+if view == "Top Grantee Summary":
+    _, merged_onchain_summary = load_onchain_data()
+    
+    st.markdown("""
+    ### Top Grantee Performance Overview
+
+    This table shows the top grantees by program, combining development metrics with onchain transaction data. Here's what you're looking at:
+
+    - **Development Activity Index**: Measures coding intensity (higher is better).
+      - <span style="color: green;">Green</span>: High activity (>50)
+      - <span style="color: red;">Red</span>: Low activity (<20)
+    
+    - **Days Since Last Commit**: Indicates how recently the project was updated.
+      - <span style="color: red;">Red</span>: No recent activity (>30 days)
+    
+    - **Transactions**: Compares on-chain activity before and after July 1st.
+      - 🟩: Increase in transactions
+      - 🔻: Decrease in transactions
+      - 🔷: No significant change
+
+    This data helps us identify:
+    1. Which projects are actively developing and gaining traction?
+    2. Where might we need to provide additional support or guidance?
+
+    Use the sorting and filtering options to explore the data (hover on the top right of the table for options)
+    """, unsafe_allow_html=True)
+    
+    summary = pd.read_csv("./data/Info by program.csv")
+
+    # Merge summary with metrics_data
+    top_grantee_data = pd.merge(summary, 
+                        metrics_data[['Project Key', 'Development Activity Index', 'Last Commit']], 
+                        left_on='project_name', 
+                        right_on='Project Key', 
+                        how='outer')
+
+    # If you want to drop the redundant 'Project Key' column after merging
+    # top_grantee_data = top_grantee_data.drop('Project Key', axis=1)
+
+    # Rename 'Project Name' to 'OSO Project Name' and fill blank values
+    #top_grantee_data = top_grantee_data.rename(columns={'project_name': 'OSO Project Name'})
+    
+    # Create the new 'OSO Project Name' column
+    top_grantee_data['OSO Project Name'] = top_grantee_data['Project Key']
+    
+    # Drop the redundant 'Project Key' column after merging
+    top_grantee_data = top_grantee_data.drop('Project Key', axis=1)
+
+    top_grantee_data['OSO Project Name'] = top_grantee_data['OSO Project Name'].fillna('No Data')
+
+    # Format Development Activity Index without decimal
+    top_grantee_data['Development Activity Index'] = top_grantee_data['Development Activity Index'].apply(lambda x: f"{x:.0f}" if pd.notnull(x) else pd.NA)
+
+    def days_ago(date_value):
+        if pd.isnull(date_value) or date_value == 'No data':
+            return pd.NA
+        try:
+            if isinstance(date_value, str):
+                commit_date = datetime.strptime(date_value, '%Y-%m-%d %H:%M:%S%z')
+            elif isinstance(date_value, pd.Timestamp):
+                commit_date = date_value.to_pydatetime()
+            else:
+                return pd.NA
+            
+            # Ensure the date has timezone information
+            if commit_date.tzinfo is None:
+                commit_date = commit_date.replace(tzinfo=timezone.utc)
+            
+            days = (datetime.now(timezone.utc) - commit_date).days
+            return days
+        except ValueError:
+            return pd.NA
+    
+    top_grantee_data['Days Since Last Commit'] = top_grantee_data['Last Commit'].apply(days_ago).astype('Int64')
+    top_grantee_data = top_grantee_data.drop('Last Commit', axis=1)  # Remove the original 'Last Commit' column
+
+    # Perform the left join with specific columns
+    combined_data = pd.merge(
+        top_grantee_data,
+        merged_onchain_summary[['project_name', 'pct_change', 'transaction_count_after_july', 'transaction_count_before_july']],
+        how='left',
+        left_on='OSO Project Name',
+        right_on='project_name'
+    )
+
+    # Drop the redundant 'project_name' column from merged_onchain_summary
+    combined_data = combined_data.drop(columns=['project_name'], errors='ignore')
 
-with code_metrics:
+    # Rename columns for clarity if needed
+    combined_data = combined_data.rename(columns={
+        'pct_change': 'Transaction Count % Change',
+        'transaction_count_after_july': 'Transactions After July 1st',
+        'transaction_count_before_july': 'Transactions Before July 1st (3 months)'
+    })
+    
+    # Convert transaction columns to numeric, keeping NaN values
+    combined_data['Transactions Before July 1st (3 months)'] = pd.to_numeric(combined_data['Transactions Before July 1st (3 months)'], errors='coerce')
+    combined_data['Transactions After July 1st'] = pd.to_numeric(combined_data['Transactions After July 1st'], errors='coerce')
+    
+    # Function to determine change direction with colored Unicode symbols
+    def change_direction(before, after):
+        if pd.isna(before) or pd.isna(after):
+            return ''
+        if after > before:
+            return '🟩'  # Green circle for increase
+        elif after < before:
+            return '🔻'  # Red circle for decrease
+        else:
+            return '🔷'  # White circle for no change
+    
+    # Add new column for change direction
+    combined_data['Change in Transactions'] = combined_data.apply(
+        lambda row: change_direction(row['Transactions Before July 1st (3 months)'], row['Transactions After July 1st']),
+        axis=1
+    )
+    
+    # Reorder the columns
+    column_order = [
+        'Grantee',
+        'OSO Project Name',
+        'Program',
+        'Development Activity Index',
+        'Days Since Last Commit',
+        'Transactions Before July 1st (3 months)',
+        'Transactions After July 1st',
+        'Change in Transactions'
+    ]
+    
+    # Reindex the dataframe with the new column order
+    combined_data = combined_data.reindex(columns=column_order)
+
+    # Function to safely convert to numeric
+    def safe_numeric(value):
+        try:
+            return pd.to_numeric(value)
+        except:
+            return np.nan
+    
+    # Function to format Development Activity Index
+    def format_dev_activity_index(value):
+        value = safe_numeric(value)
+        if pd.isna(value):
+            return ''
+        if value < 20:
+            return 'color: red'
+        elif value > 50:
+            return 'color: green'
+        return ''
+    
+    # Function to format Change in Transactions
+    def format_change_in_transactions(value):
+        if value == '🟢':
+            return 'color: green'
+        elif value == '🔴':
+            return 'color: red'
+        return ''
+    
+    # Function to format Days Since Last Commit
+    def format_days_since_last_commit(value):
+        value = safe_numeric(value)
+        if pd.isna(value):
+            return ''
+        if value > 30:
+            return 'color: red'
+        return ''
+    
+    # Function to apply styling to the entire dataframe
+    def style_dataframe(df):
+        # Convert columns to numeric
+        df['Development Activity Index'] = df['Development Activity Index'].apply(safe_numeric)
+        df['Days Since Last Commit'] = df['Days Since Last Commit'].apply(safe_numeric)
+
+        # Sort the dataframe by Development Activity Index in descending order
+        df = df.sort_values('Development Activity Index', ascending=False)
+        
+        return df.style.applymap(format_dev_activity_index, subset=['Development Activity Index']) \
+                       .applymap(format_change_in_transactions, subset=['Change in Transactions']) \
+                       .applymap(format_days_since_last_commit, subset=['Days Since Last Commit']) \
+                       .format({
+                           'Development Activity Index': '{:.0f}',
+                           'Days Since Last Commit': '{:.0f}',
+                           'Transactions Before July 1st (3 months)': '{:,.0f}',
+                           'Transactions After July 1st': '{:,.0f}'
+                       }, na_rep="")
+
+
+    st.caption("\* Note: Grantee and Program columns are populated for projects identified as top grantees in the program")
+    # Display the dataframe
+    st.dataframe(
+        style_dataframe(combined_data),
+        use_container_width=True,
+        height=1600,
+        hide_index=True,
+        column_config={
+            "Grantee": st.column_config.TextColumn(label="Grantee*"),
+            "Program": st.column_config.TextColumn(label="Program*"),
+            "Transactions Before July 1st (3 months)": st.column_config.NumberColumn(format="%d"),
+            "Transactions After July 1st": st.column_config.NumberColumn(format="%d"),
+            "Development Activity Index": st.column_config.Column(width="medium", help="Development Activity Index: <20 (red), >50 (green)"),
+            "Days Since Last Commit": st.column_config.Column(width="medium",help="Days Since Last Commit: >30 (red)")
+        }
+    )
+
+
+if view == "Code Metrics":
     st.markdown("### What are the top projects based on development activities in the last 6 months?")
     st.markdown("""
     The Development Activity Index is a custom metric designed to measure the overall coding activity of a project. \
@@ -140,7 +379,7 @@ with code_metrics:
                 ", ".join(emerging_projects['Project Name'].tolist()))
     
     # Calculate the date 3 months ago from today in UTC
-    three_months_ago = datetime.now(pytz.UTC) - timedelta(days=90)
+    three_months_ago = datetime.now(timezone.utc) - timedelta(days=90)
     
     
     # Display the dataframe without index
@@ -205,6 +444,8 @@ with code_metrics:
     st.info("**Note:** This ratio should be considered alongside other factors such as project complexity, stage of development, and specific project goals.")
     
     
+    px, go = load_plotting()
+    
     # Calculate the ratio
     metrics_data['Activity per Developer'] = metrics_data['Development Activity Index'] / metrics_data['Active Developer Count']
     
@@ -300,25 +541,10 @@ with code_metrics:
     # Display the plot in Streamlit
     st.plotly_chart(fig, use_container_width=True)
 
-with onchain_metrics:
+if view == "Onchain Transactions":
+    # Copied because display columns are added below and the cached summary is shared with other views
+    merged_onchain_summary = load_onchain_data()[1].copy()
 #    onchain_data = pd.read_csv("./data/monthly transactions by projects.csv")
-    onchain_data_detail = pd.read_csv("./data/transact.csv")
-    
-    # Convert block_timestamp to datetime
-    onchain_data_detail['block_timestamp'] = pd.to_datetime(onchain_data_detail['block_timestamp'])
-    
-    # Extract year-month from block_timestamp for aggregation
-    onchain_data_detail['month'] = onchain_data_detail['block_timestamp'].dt.to_period('M')
-    
-    # Group by 'month' and 'project_name', and calculate the required aggregations
-    onchain_data = onchain_data_detail.groupby(['month', 'project_name']).agg(
-        transaction_count=('transaction_hash', 'nunique'),
-        distinct_to_addresses=('to_address', 'nunique'),
-        distinct_from_addresses=('from_address', 'nunique')
-    ).reset_index()
-        
-    # Convert 'month' back to string format for final output
-    #aggregated_df['month'] = aggregated_df['month'].astype(str)
 
     st.markdown("""
     ### Which projects have gained most momentum in # of onchain transactions since July 1st, 2024?
@@ -333,27 +559,7 @@ with onchain_metrics:
     - **Sorting**: Projects are sorted by the percentage change in transaction count, with projects showing the largest positive changes at the top.
     """)
 
-    
-    # Create two separate dataframes, one for before and one for after July 1st
-    df_before_july = onchain_data[onchain_data['month'] < '2024-07']
-    df_after_july = onchain_data[onchain_data['month'] >= '2024-07']
-    
-    # Group by project and calculate total transaction count for both periods
-    before_july_summary = df_before_july.groupby('project_name')['transaction_count'].sum().reset_index()
-    after_july_summary = df_after_july.groupby('project_name')['transaction_count'].sum().reset_index()
-    
-    # Merge the two summaries into one dataframe
-    merged_onchain_summary = pd.merge(before_july_summary, after_july_summary, on='project_name', how='outer', suffixes=('_before_july', '_after_july')).fillna(0)
-    
-    # Calculate percentage change ((after - before) / before) * 100
-    merged_onchain_summary['pct_change'] = ((merged_onchain_summary['transaction_count_after_july'] - merged_onchain_summary['transaction_count_before_july']) / 
-                                    merged_onchain_summary['transaction_count_before_july'].replace(0, 1)) * 100
-    
-    # Sort the data by percentage change in descending order (highest to lowest)
-    merged_onchain_summary = merged_onchain_summary.sort_values(by='pct_change', ascending=False)
-    
-    # Identify projects with drops (transaction count after July is less than before July)
-    merged_onchain_summary['dropped'] = merged_onchain_summary['transaction_count_after_july'] < merged_onchain_summary['transaction_count_before_july']
+    px, go = load_plotting()
     
     # Create the dumbbell plot
     fig = go.Figure()
@@ -419,35 +625,13 @@ with onchain_metrics:
                 allowing for an easy comparison across projects. Each project name is also suffixed with the number of transactions \
                 that involved users with a Farcaster account, displayed as a ratio of transactions with Farcaster users to the total transactions.")
     
-    onchain_data_detail_farcaster = pd.read_csv("./data/Transaction Detail with Farcaster.csv")
-
-    onchain_merge = pd.merge(
-        onchain_data_detail, 
-        onchain_data_detail_farcaster[['transaction_hash', 'farcaster_username', 'to_address', 'from_address','artifact_name']],
-        on=['transaction_hash', 'to_address', 'from_address','artifact_name'], 
-        how='left'
-    )
-
-    onchain_merge = onchain_merge.drop_duplicates()
-
-    aggregate_df = onchain_merge.groupby('project_name').agg(
-        total_transactions=('transaction_hash', 'count'),
-        transaction_with_farcaster_name=('farcaster_username', lambda x: x.notna().sum()),
-        missing_passport_score=('passport_score', lambda x: x.isna().sum()),
-        passport_score_between_0_and_5=('passport_score', lambda x: ((x >= 0) & (x <= 5)).sum()),
-        passport_score_between_5_and_15=('passport_score', lambda x: ((x > 5) & (x <= 15)).sum()),
-        passport_score_above_15=('passport_score', lambda x: (x > 15).sum())
-    ).reset_index()
+    # Copied because project_name is rewritten below
+    aggregate_df = load_farcaster_data()[1].copy()
     
     # Updating the project_name column by appending the ratio of transaction_with_farcaster_name / total_transactions
     aggregate_df['project_name'] = aggregate_df.apply(
         lambda row: f"{row['project_name']} ({row['transaction_with_farcaster_name']}/{row['total_transactions']})", axis=1
     )
-
-    aggregate_df['pct_missing'] = (aggregate_df['missing_passport_score'] / aggregate_df['total_transactions']) * 100
-    aggregate_df['pct_0_5'] = (aggregate_df['passport_score_between_0_and_5'] / aggregate_df['total_transactions']) * 100
-    aggregate_df['pct_5_15'] = (aggregate_df['passport_score_between_5_and_15'] / aggregate_df['total_transactions']) * 100
-    aggregate_df['pct_15_plus'] = (aggregate_df['passport_score_above_15'] / aggregate_df['total_transactions']) * 100
     
     aggregate_df=aggregate_df.sort_values(by=['pct_15_plus','pct_5_15','pct_0_5','pct_missing'],ascending=[True,True,True,True])
     
@@ -491,7 +675,59 @@ with onchain_metrics:
     
     st.plotly_chart(fig, use_container_width=True)
 
-with integrated_view:
+if view == "User Retention":
+    st.markdown("""
+    ### Do users come back after their first transaction with a project? (April - September 2024)
+
+    Users (distinct `from_address` values) are grouped into cohorts by the month they first transacted with a project. \
+    Each row of the chart shows the percentage of that cohort that transacted with the project again 1, 2, 3... months later.
+
+    - **Month 0** is always 100%: it is the month the cohort was formed.
+    - A project whose later months stay high is retaining its users; a sharp drop after Month 0 suggests mostly one-off usage.
+    """)
+
+    month_labels, _, _, user_bitmaps = load_user_index()
+    returning_users = load_returning_users()
+
+    selected_project = st.selectbox("Select a project", returning_users['Project Key'].tolist())
+
+    retention = compute_retention_matrix(month_labels, user_bitmaps[selected_project])
+    offset_columns = [column for column in retention.columns if column.startswith('Month ')]
+    cohort_labels = [f"{row['Cohort']} ({row['New Users']:,} users)" for _, row in retention.iterrows()]
+
+    px, go = load_plotting()
+
+    fig = px.imshow(retention[offset_columns].round(1),
+                    labels=dict(x="Months Since First Transaction", y="Cohort", color="% of Cohort Active"),
+                    x=offset_columns,
+                    y=cohort_labels,
+                    aspect="auto",
+                    text_auto=True,
+                    color_continuous_scale="Greens",
+                    zmin=0,
+                    zmax=100)
+
+    fig.update_layout(
+        title=f'Monthly User Retention by Cohort: {selected_project}',
+        xaxis={'type': 'category', 'side': 'top'},
+        yaxis={'type': 'category'},
+        height=max(400, len(cohort_labels) * 60)
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("**Returning users across all projects**")
+    st.dataframe(
+        returning_users,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "% Returning": st.column_config.NumberColumn(format="%.1f%%"),
+        }
+    )
+
+if view == "Integrated View":
+    _, merged_onchain_summary = load_onchain_data()
 
     # User-friendly explanation
     st.markdown("""
@@ -542,6 +778,8 @@ with integrated_view:
     # Sort by Commit Count in descending order
     final_data = final_data.sort_values('Development Activity Index', ascending=False)
 
+    px, go = load_plotting()
+
         # Create the scatter plot
     fig = px.scatter(
         final_data,
@@ -571,205 +809,202 @@ with integrated_view:
     # Display the plot
     st.plotly_chart(fig, use_container_width=True)
 
-
-with overall_summary:
-    
     st.markdown("""
-    ### Top Grantee Performance Overview
-
-    This table shows the top grantees by program, combining development metrics with onchain transaction data. Here's what you're looking at:
-
-    - **Development Activity Index**: Measures coding intensity (higher is better).
-      - <span style="color: green;">Green</span>: High activity (>50)
-      - <span style="color: red;">Red</span>: Low activity (<20)
-    
-    - **Days Since Last Commit**: Indicates how recently the project was updated.
-      - <span style="color: red;">Red</span>: No recent activity (>30 days)
-    
-    - **Transactions**: Compares on-chain activity before and after July 1st.
-      - 🟩: Increase in transactions
-      - 🔻: Decrease in transactions
-      - 🔷: No significant change
+    ### Which projects share the same users? (April - September 2024)
 
-    This data helps us identify:
-    1. Which projects are actively developing and gaining traction?
-    2. Where might we need to provide additional support or guidance?
+    This heatmap shows how many distinct users (`from_address`) transacted with both projects in each pair.
 
-    Use the sorting and filtering options to explore the data (hover on the top right of the table for options)
-    """, unsafe_allow_html=True)
-    
-    summary = pd.read_csv("./data/Info by program.csv")
-
-    # Merge summary with metrics_data
-    top_grantee_data = pd.merge(summary, 
-                        metrics_data[['Project Key', 'Development Activity Index', 'Last Commit']], 
-                        left_on='project_name', 
-                        right_on='Project Key', 
-                        how='outer')
+    - Projects are clustered so that those with similar user bases appear next to each other; bright blocks point to groups of projects serving a common community.
+    - Only projects that share at least one user with another project are shown. Hover over a cell to see both project names and the shared user count.
+    """)
 
-    # If you want to drop the redundant 'Project Key' column after merging
-    # top_grantee_data = top_grantee_data.drop('Project Key', axis=1)
+    shared_users = load_shared_users()
 
-    # Rename 'Project Name' to 'OSO Project Name' and fill blank values
-    #top_grantee_data = top_grantee_data.rename(columns={'project_name': 'OSO Project Name'})
-    
-    # Create the new 'OSO Project Name' column
-    top_grantee_data['OSO Project Name'] = top_grantee_data['Project Key']
-    
-    # Drop the redundant 'Project Key' column after merging
-    top_grantee_data = top_grantee_data.drop('Project Key', axis=1)
+    if len(shared_users) < 2:
+        st.info("No users are shared between projects in this data.")
+    else:
+        # Hide the diagonal, which is each project's own user count
+        shared_users = shared_users.where(~np.eye(len(shared_users), dtype=bool))
 
-    top_grantee_data['OSO Project Name'] = top_grantee_data['OSO Project Name'].fillna('No Data')
+        fig = px.imshow(shared_users,
+                        labels=dict(x="Project", y="Project", color="Shared Users"),
+                        x=shared_users.columns,
+                        y=shared_users.index,
+                        aspect="auto",
+                        color_continuous_scale="Blues")
 
-    # Format Development Activity Index without decimal
-    top_grantee_data['Development Activity Index'] = top_grantee_data['Development Activity Index'].apply(lambda x: f"{x:.0f}" if pd.notnull(x) else pd.NA)
+        fig.update_layout(
+            title='Distinct Users Shared Between Projects',
+            xaxis={'type': 'category'},
+            yaxis={'type': 'category'},
+            height=max(600, len(shared_users) * 25),
+            width=800
+        )
 
-    def days_ago(date_value):
-        if pd.isnull(date_value) or date_value == 'No data':
-            return pd.NA
-        try:
-            if isinstance(date_value, str):
-                commit_date = datetime.strptime(date_value, '%Y-%m-%d %H:%M:%S%z')
-            elif isinstance(date_value, pd.Timestamp):
-                commit_date = date_value.to_pydatetime()
-            else:
-                return pd.NA
-            
-            # Ensure the date has timezone information
-            if commit_date.tzinfo is None:
-                commit_date = commit_date.replace(tzinfo=timezone.utc)
-            
-            days = (datetime.now(timezone.utc) - commit_date).days
-            return days
-        except ValueError:
-            return pd.NA
-    
-    top_grantee_data['Days Since Last Commit'] = top_grantee_data['Last Commit'].apply(days_ago).astype('Int64')
-    top_grantee_data = top_grantee_data.drop('Last Commit', axis=1)  # Remove the original 'Last Commit' column
-
-    # Perform the left join with specific columns
-    combined_data = pd.merge(
-        top_grantee_data,
-        merged_onchain_summary[['project_name', 'pct_change', 'transaction_count_after_july', 'transaction_count_before_july']],
-        how='left',
-        left_on='OSO Project Name',
-        right_on='project_name'
-    )
+        st.plotly_chart(fig, use_container_width=True)
 
-    # Drop the redundant 'project_name' column from merged_onchain_summary
-    combined_data = combined_data.drop(columns=['project_name'], errors='ignore')
 
-    # Rename columns for clarity if needed
-    combined_data = combined_data.rename(columns={
-        'pct_change': 'Transaction Count % Change',
-        'transaction_count_after_july': 'Transactions After July 1st',
-        'transaction_count_before_july': 'Transactions Before July 1st (3 months)'
-    })
-    
-    # Convert transaction columns to numeric, keeping NaN values
-    combined_data['Transactions Before July 1st (3 months)'] = pd.to_numeric(combined_data['Transactions Before July 1st (3 months)'], errors='coerce')
-    combined_data['Transactions After July 1st'] = pd.to_numeric(combined_data['Transactions After July 1st'], errors='coerce')
-    
-    # Function to determine change direction with colored Unicode symbols
-    def change_direction(before, after):
-        if pd.isna(before) or pd.isna(after):
-            return ''
-        if after > before:
-            return '🟩'  # Green circle for increase
-        elif after < before:
-            return '🔻'  # Red circle for decrease
-        else:
-            return '🔷'  # White circle for no change
-    
-    # Add new column for change direction
-    combined_data['Change in Transactions'] = combined_data.apply(
-        lambda row: change_direction(row['Transactions Before July 1st (3 months)'], row['Transactions After July 1st']),
-        axis=1
-    )
-    
-    # Reorder the columns
-    column_order = [
-        'Grantee',
-        'OSO Project Name',
-        'Program',
-        'Development Activity Index',
-        'Days Since Last Commit',
-        'Transactions Before July 1st (3 months)',
-        'Transactions After July 1st',
-        'Change in Transactions'
-    ]
-    
-    # Reindex the dataframe with the new column order
-    combined_data = combined_data.reindex(columns=column_order)
+if view == "Snapshot Diff":
+    st.markdown("""
+    ### How have grantees changed between two data drops?
 
-    # Function to safely convert to numeric
-    def safe_numeric(value):
-        try:
-            return pd.to_numeric(value)
-        except:
-            return np.nan
-    
-    # Function to format Development Activity Index
-    def format_dev_activity_index(value):
-        value = safe_numeric(value)
-        if pd.isna(value):
-            return ''
-        if value < 20:
-            return 'color: red'
-        elif value > 50:
-            return 'color: green'
-        return ''
-    
-    # Function to format Change in Transactions
-    def format_change_in_transactions(value):
-        if value == '🟢':
-            return 'color: green'
-        elif value == '🔴':
-            return 'color: red'
-        return ''
-    
-    # Function to format Days Since Last Commit
-    def format_days_since_last_commit(value):
-        value = safe_numeric(value)
-        if pd.isna(value):
-            return ''
-        if value > 30:
-            return 'color: red'
-        return ''
-    
-    # Function to apply styling to the entire dataframe
-    def style_dataframe(df):
-        # Convert columns to numeric
-        df['Development Activity Index'] = df['Development Activity Index'].apply(safe_numeric)
-        df['Days Since Last Commit'] = df['Days Since Last Commit'].apply(safe_numeric)
+    Each refresh of the data can be stored as a dated snapshot. Pick two snapshots to compare each project's \
+    Development Activity Index, code activity, transaction counts and passport score mix between them.
 
-        # Sort the dataframe by Development Activity Index in descending order
-        df = df.sort_values('Development Activity Index', ascending=False)
-        
-        return df.style.applymap(format_dev_activity_index, subset=['Development Activity Index']) \
-                       .applymap(format_change_in_transactions, subset=['Change in Transactions']) \
-                       .applymap(format_days_since_last_commit, subset=['Days Since Last Commit']) \
-                       .format({
-                           'Development Activity Index': '{:.0f}',
-                           'Days Since Last Commit': '{:.0f}',
-                           'Transactions Before July 1st (3 months)': '{:,.0f}',
-                           'Transactions After July 1st': '{:,.0f}'
-                       }, na_rep="")
+    - **Change** columns show the new value minus the old value; passport columns are changes in percentage points.
+    - Projects that only appear in one of the snapshots have empty values for the other.
+    """)
 
+    snapshots = list_snapshots()
 
-    st.caption("\* Note: Grantee and Program columns are populated for projects identified as top grantees in the program")
-    # Display the dataframe
+    if len(snapshots) < 2:
+        st.info("At least two snapshots are needed for a comparison. Store the current data drop with `python snapshots.py <extraction date>`.")
+    else:
+        old_column, new_column = st.columns(2)
+        old_snapshot = old_column.selectbox("Compare snapshot", snapshots, index=len(snapshots) - 2)
+        new_snapshot = new_column.selectbox("With snapshot", snapshots, index=len(snapshots) - 1)
+
+        # Aggregate files are small, so read them on every run to pick up snapshots that were re-saved
+        diff = diff_snapshots(load_snapshot_aggregates(old_snapshot), load_snapshot_aggregates(new_snapshot))
+        diff = diff.sort_values('Development Activity Index (change)', key=lambda x: x.abs(), ascending=False)
+
+        columns_to_display = [
+            'Project Name',
+            'Development Activity Index (old)',
+            'Development Activity Index (new)',
+            'Development Activity Index (change)',
+            'Commit Count (change)',
+            '# of Merged PRs (change)',
+            '# of Open PRs (change)',
+            'Total Transactions (old)',
+            'Total Transactions (new)',
+            'Total Transactions (change)',
+            'pct_missing (change)',
+            'pct_0_5 (change)',
+            'pct_5_15 (change)',
+            'pct_15_plus (change)'
+        ]
+
+        st.caption("Click on a column name to sort the table.")
+        st.dataframe(
+            diff[columns_to_display],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Development Activity Index (old)": st.column_config.NumberColumn(format="%d"),
+                "Development Activity Index (new)": st.column_config.NumberColumn(format="%d"),
+                "Development Activity Index (change)": st.column_config.NumberColumn(format="%+d"),
+                "Total Transactions (old)": st.column_config.NumberColumn(format="%d"),
+                "Total Transactions (new)": st.column_config.NumberColumn(format="%d"),
+                "pct_missing (change)": st.column_config.NumberColumn(label="Passport Score Missing (pp change)", format="%+.1f"),
+                "pct_0_5 (change)": st.column_config.NumberColumn(label="Passport Score < 5 (pp change)", format="%+.1f"),
+                "pct_5_15 (change)": st.column_config.NumberColumn(label="Passport Score 5-15 (pp change)", format="%+.1f"),
+                "pct_15_plus (change)": st.column_config.NumberColumn(label="Passport Score 15+ (pp change)", format="%+.1f"),
+            }
+        )
+
+# Runs as a fragment so picking another project reruns only this function, not the whole page
+@st.fragment
+def render_project_drilldown(metrics_data):
+    (detail_by_project, detail_offsets), (merge_by_project, merge_offsets), programs_by_project = load_project_index()
+
+    project_keys = sorted(set(metrics_data['Project Key']) | set(detail_offsets.index))
+    drilldown_project = st.selectbox("Select a project", project_keys, key="drilldown_project")
+
+    project_metrics = metrics_data[metrics_data['Project Key'] == drilldown_project]
+    project_programs = programs_by_project.get(drilldown_project, [])
+    project_transactions = slice_project(detail_by_project, detail_offsets, drilldown_project)
+    project_merge = slice_project(merge_by_project, merge_offsets, drilldown_project)
+
+    st.markdown(f"**Program:** {', '.join(project_programs) if len(project_programs) else 'Not a top grantee in any program'}")
+
+    st.markdown("#### Code Metrics (last 6 months)")
+    if project_metrics.empty:
+        st.markdown("No code metrics available for this project.")
+    else:
+        project = project_metrics.iloc[0]
+        index_column, commits_column, prs_column, devs_column, last_commit_column = st.columns(5)
+        index_column.metric("Development Activity Index", f"{project['Development Activity Index']:.0f}")
+        commits_column.metric("Commit Count", f"{project['Commit Count']:,.0f}")
+        prs_column.metric("# of Merged PRs", f"{project['# of Merged PRs']:,.0f}")
+        devs_column.metric("Active Developer Count", f"{project['Active Developer Count']:,.0f}")
+        last_commit = pd.to_datetime(project['Last Commit'])
+        last_commit_column.metric("Last Commit", last_commit.strftime('%d-%b-%Y') if pd.notna(last_commit) else "No data")
+
+    st.markdown("#### Onchain Activity")
+    if project_transactions.empty:
+        st.markdown("No onchain transactions recorded for this project.")
+    else:
+        px, go = load_plotting()
+
+        monthly_transactions = project_transactions.groupby('month').agg(
+            transaction_count=('transaction_hash', 'nunique'),
+            distinct_from_addresses=('from_address', 'nunique')
+        ).reset_index()
+        monthly_transactions['month'] = monthly_transactions['month'].astype(str)
+
+        fig = px.bar(
+            monthly_transactions,
+            x='month',
+            y='transaction_count',
+            hover_data=['distinct_from_addresses'],
+            labels={'month': 'Month', 'transaction_count': 'Transactions', 'distinct_from_addresses': 'Distinct Users'},
+            title=f'Monthly Transactions: {drilldown_project}'
+        )
+        fig.update_layout(xaxis={'type': 'category'})
+        st.plotly_chart(fig, use_container_width=True)
+
+        passport_column, farcaster_column = st.columns(2)
+
+        with passport_column:
+            project_passport = compute_passport_distribution(project_merge).iloc[0]
+            passport_mix = pd.DataFrame({
+                'Passport Score Range': ['Passport Score Missing', 'Passport Score < 5', 'Passport Score 5-15', 'Passport Score 15+'],
+                'Transactions': [
+                    project_passport['missing_passport_score'],
+                    project_passport['passport_score_between_0_and_5'],
+                    project_passport['passport_score_between_5_and_15'],
+                    project_passport['passport_score_above_15']
+                ]
+            })
+
+            fig = px.pie(
+                passport_mix,
+                names='Passport Score Range',
+                values='Transactions',
+                color='Passport Score Range',
+                color_discrete_map={'Passport Score Missing': 'lightgrey', 'Passport Score < 5': 'lightcoral', 'Passport Score 5-15': 'lightblue', 'Passport Score 15+': 'lightgreen'},
+                title='Transactions by Passport Score'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        with farcaster_column:
+            farcaster_users = project_merge['farcaster_username'].dropna().value_counts().rename_axis('Farcaster User').reset_index(name='Transactions')
+            st.markdown(f"**Farcaster users:** {len(farcaster_users):,} ({farcaster_users['Transactions'].sum():,} of {len(project_merge):,} transactions)")
+            st.dataframe(farcaster_users, use_container_width=True, hide_index=True)
+
+if view == "Project Drill-down":
+    st.markdown("### Project Drill-down")
+    st.markdown("Select a grantee to see its program, code metrics and onchain activity (April - September 2024) in one place.")
+
+    render_project_drilldown(metrics_data)
+
+if mark('time to first full page'):
+    # Also log the cold start so it shows up in the container logs of new replicas
+    for row in startup_report():
+        seconds = f"{row['Seconds']:.3f}s" if row['Seconds'] is not None else "-"
+        print(f"[startup] {row['Step']}: {seconds} ({row['Note']})")
+
+with st.expander("Startup report"):
+    st.caption("Import time per module and render milestones for the cold start of this server process, in seconds. Milestones are measured from the start of the server process.")
+    # streamlit, pandas and numpy are already loaded by the Streamlit runtime, so their cost can only be measured in a separate interpreter
+    if st.button("Measure core import times", help="Imports streamlit, pandas and numpy one at a time in a fresh Python interpreter"):
+        measure_core_imports()
     st.dataframe(
-        style_dataframe(combined_data),
+        pd.DataFrame(startup_report()),
         use_container_width=True,
-        height=1600,
         hide_index=True,
         column_config={
-            "Grantee": st.column_config.TextColumn(label="Grantee*"),
-            "Program": st.column_config.TextColumn(label="Program*"),
-            "Transactions Before July 1st (3 months)": st.column_config.NumberColumn(format="%d"),
-            "Transactions After July 1st": st.column_config.NumberColumn(format="%d"),
-            "Development Activity Index": st.column_config.Column(width="medium", help="Development Activity Index: <20 (red), >50 (green)"),
-            "Days Since Last Commit": st.column_config.Column(width="medium",help="Days Since Last Commit: >30 (red)")
+            "Seconds": st.column_config.NumberColumn(format="%.3f"),
         }
     )
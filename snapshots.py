@@ -0,0 +1,87 @@
+import argparse
+import os
+import shutil
+
+import pandas as pd
+
+from aggregates import DATA_DIR, build_project_table
+
+SNAPSHOT_DIR = f"{DATA_DIR}/snapshots"
+AGGREGATES_FILE = "project_aggregates.csv"
+
+# Input files needed to rebuild a snapshot's aggregates
+SNAPSHOT_INPUTS = [
+    "project_metrics.csv",
+    "transact.csv",
+    "Transaction Detail with Farcaster.csv",
+    "Info by program.csv",
+]
+
+# Per-project metrics compared between two snapshots
+SNAPSHOT_METRICS = [
+    'Development Activity Index',
+    'Commit Count',
+    '# of Merged PRs',
+    '# of Open PRs',
+    'Total Transactions',
+    'pct_missing',
+    'pct_0_5',
+    'pct_5_15',
+    'pct_15_plus',
+]
+
+def save_snapshot(snapshot_date, data_dir=DATA_DIR, snapshot_dir=None, keep_inputs=False):
+    if snapshot_dir is None:
+        snapshot_dir = os.path.join(data_dir, 'snapshots')
+    target = os.path.join(snapshot_dir, snapshot_date)
+    os.makedirs(target, exist_ok=True)
+
+    # Optionally keep a local copy of the raw inputs so the snapshot can be rebuilt if the aggregates change;
+    # these copies are gitignored, only the aggregates are meant to be committed
+    if keep_inputs:
+        for file_name in SNAPSHOT_INPUTS:
+            shutil.copy2(os.path.join(data_dir, file_name), target)
+
+    projects = build_project_table(data_dir).rename(columns={'project_name': 'Project Key'})
+    projects['Total Transactions'] = projects['transaction_count_before_july'].fillna(0) + projects['transaction_count_after_july'].fillna(0)
+    projects.to_csv(os.path.join(target, AGGREGATES_FILE), index=False)
+
+    return target
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    if not os.path.isdir(snapshot_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(snapshot_dir)
+        if os.path.isfile(os.path.join(snapshot_dir, name, AGGREGATES_FILE))
+    )
+
+def load_snapshot_aggregates(snapshot_date, snapshot_dir=SNAPSHOT_DIR):
+    return pd.read_csv(os.path.join(snapshot_dir, snapshot_date, AGGREGATES_FILE))
+
+def diff_snapshots(old_aggregates, new_aggregates):
+    old = old_aggregates[['Project Key', 'Project Name'] + SNAPSHOT_METRICS]
+    new = new_aggregates[['Project Key', 'Project Name'] + SNAPSHOT_METRICS]
+
+    # Outer join so projects added to or dropped from the collection still show up
+    diff = pd.merge(old, new, on='Project Key', how='outer', suffixes=(' (old)', ' (new)'))
+    diff['Project Name'] = diff['Project Name (new)'].fillna(diff['Project Name (old)']).fillna(diff['Project Key'])
+    diff = diff.drop(columns=['Project Name (old)', 'Project Name (new)'])
+
+    for metric in SNAPSHOT_METRICS:
+        diff[f"{metric} (change)"] = diff[f"{metric} (new)"] - diff[f"{metric} (old)"]
+
+    return diff
+
+def main():
+    parser = argparse.ArgumentParser(description="Store the current data drop as a dated snapshot.")
+    parser.add_argument('snapshot_date', help="Date the data was extracted, e.g. 2024-09-25")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--keep-inputs', action='store_true', help="Also copy the raw input files into the snapshot")
+    args = parser.parse_args()
+
+    target = save_snapshot(args.snapshot_date, args.data_dir, keep_inputs=args.keep_inputs)
+    print(f"Saved snapshot to {target}")
+
+if __name__ == '__main__':
+    main()
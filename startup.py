@@ -0,0 +1,82 @@
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+def process_age():
+    # Seconds since the server process was started, read from /proc so server boot and
+    # the Streamlit runtime's own imports are included; 0 where /proc is not available
+    try:
+        with open('/proc/self/stat') as stat_file:
+            # The command name can contain spaces, so split after its closing parenthesis
+            fields = stat_file.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+    except OSError:
+        return 0.0
+    # starttime is field 22 of the stat line, i.e. index 19 once pid and command name are removed
+    return max(uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK'), 0.0)
+
+# Module-level state survives Streamlit reruns, so these describe the cold start of the current process
+PROCESS_START = time.perf_counter() - process_age()
+IMPORT_TIMES = {}
+# Cold import cost of the core modules, which the Streamlit runtime has already loaded before the app script runs
+CORE_MODULES = ['streamlit', 'pandas', 'numpy']
+CORE_IMPORT_TIMES = {}
+MILESTONES = {'app script start': time.perf_counter() - PROCESS_START}
+
+def timed_import(module_name):
+    if module_name in IMPORT_TIMES:
+        return sys.modules[module_name]
+    # Modules already imported elsewhere (e.g. by the Streamlit runtime before the app script ran) are recorded without a time
+    if module_name in sys.modules:
+        IMPORT_TIMES[module_name] = None
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES[module_name] = time.perf_counter() - start
+    return module
+
+def measure_core_imports():
+    # Import each core module alone in a fresh interpreter and read its cumulative time from -X importtime
+    for module_name in CORE_MODULES:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+            capture_output=True, text=True
+        )
+        CORE_IMPORT_TIMES[module_name] = None
+        if result.returncode != 0:
+            continue
+        for line in result.stderr.splitlines():
+            # Lines look like "import time:  self [us] | cumulative | imported package"
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module_name:
+                CORE_IMPORT_TIMES[module_name] = int(fields[1]) / 1e6
+
+def mark(milestone):
+    # Keep the first time each milestone is reached, i.e. the cold start
+    if milestone not in MILESTONES:
+        MILESTONES[milestone] = time.perf_counter() - PROCESS_START
+        return True
+    return False
+
+def startup_report():
+    rows = [
+        {
+            'Step': f"import {name}",
+            'Seconds': seconds,
+            'Note': 'already loaded when first requested' if seconds is None else 'import time',
+        }
+        for name, seconds in IMPORT_TIMES.items()
+    ]
+    rows += [
+        {
+            'Step': f"import {name}",
+            'Seconds': seconds,
+            'Note': 'import failed in a fresh interpreter' if seconds is None else 'measured in a fresh interpreter (-X importtime)',
+        }
+        for name, seconds in CORE_IMPORT_TIMES.items()
+    ]
+    rows += [{'Step': milestone, 'Seconds': seconds, 'Note': 'since process start'} for milestone, seconds in MILESTONES.items()]
+    return rows